@@ -1,261 +1,532 @@
-import pandas as pd
-import numpy as np
-import joblib
-
-variables=[
-    'A', 'B', 'C', 'D', 'E', 'H', 'J', 'M', 
-    'N', 'O', 'P', 'Q', 'R', 'S','Monto'
-    ]
-
-def seleccion_variables(
-        df:pd.DataFrame,
-        lista_vars: list = variables) -> pd.DataFrame:
-    """
-    Selecciona las columnas indicadas de un DataFrame. En particular las utilizadas 
-    para el funcionamiento del modelo de fraude.
-    
-    Args:
-        df (pd.DataFrame): DataFrame de entrada.
-        lista_vars (list): Lista de nombres de columnas a conservar.
-
-    Returns:
-        pd.DataFrame: DataFrame con solo las columnas seleccionadas.
-
-    Raises:
-        KeyError: Si alguna columna no se encuentra en el DataFrame.
-    """
-
-    try:
-        df = df[lista_vars]
-        return df
-    except KeyError as e:
-        raise KeyError(f"Al menos un campo no pertenece al conjunto de variables: {e}")
-
-    
-
-def limpiar_y_convertir(
-        df:pd.DataFrame, 
-        columnas:list) -> pd.DataFrame :
-    """
-    Limpia separadores de miles y convierte columnas numéricas a float.
-    Ejemplo de valores corregidos: '1,234.8' → 1234.8
-
-    Parámetros:
-    -----------
-    df : pd.DataFrame, DataFrame con las columnas a limpiar
-    columnas : list, Lista de nombres de columnas a transformar
-
-    Retorna:
-    --------
-    pd.DataFrame con las columnas convertidas a float
-    """
-    for col in columnas:
-        df[col] = (
-            df[col]
-            .astype(str)                     # convierte todo a string
-            .str.replace(',', '', regex=False)  # elimina comas (miles)
-            .str.strip()                     # elimina espacios extra
-        )
-        df[col] = pd.to_numeric(df[col], errors='coerce')  # convierte a float (NaN si no puede)
-    return df
-
-def reemplazar_negativos_por_mediana(
-        df: pd.DataFrame, 
-        columnas: list) -> pd.DataFrame:
-    """
-    Reemplaza los valores negativos en las columnas indicadas por la mediana
-    de su respectiva distribución (calculada sobre toda la columna).
-
-    Parámetros
-    ----------
-    df : pd.DataFrame, DataFrame con las columnas a corregir.
-    columnas : list, Lista con los nombres de las columnas a procesar.
-
-    Retorna
-    -------
-    pd.DataFrame con los valores negativos reemplazados por la mediana.
-    """
-    for col in columnas:
-        mediana = df[col].median(skipna=True)
-        df[col] = np.where(df[col] < 0, mediana, df[col]) #Reemplazo
-    return df
-
-def imputar_nulos_por_mediana(
-        df: pd.DataFrame, 
-        columnas: list
-        ) -> pd.DataFrame:
-    """
-    Imputa los valores nulos en las columnas indicadas usando la mediana
-    de cada variable.
-
-    Parámetros
-    ----------
-    df : pd.DataFrame, DataFrame con las columnas a corregir.
-    columnas : list, Lista con los nombres de las columnas a procesar.
-
-    Retorna
-    -------
-    pd.DataFrame con los valores nulos imputados por la mediana.
-    """
-    for col in columnas:
-        mediana = df[col].median(skipna=True)
-        df[col] = df[col].fillna(mediana)
-    return df
-
-def dummificar_var_categorica(
-        df:pd.DataFrame, 
-        columna:str, 
-        categorias_principales:list, 
-        referencia:str='OTROS') -> pd.DataFrame:
-    """
-    Agrupa las categorías no deseadas en 'OTROS', crea variables dummies
-    y elimina la categoría de referencia.
-
-    Parámetros
-    ----------
-    df : pd.DataFrame, DataFrame de entrada.
-
-    columna : str,  Nombre de la columna categórica a transformar.
-
-    categorias_principales : list, Lista de categorías que se desean conservar tal cual.
-
-    referencia : str, opcional (por defecto = 'OTROS') Categoría que se tomará como referencia (no se crea dummy para ella).
-
-    Retorna
-    -------
-    pd.DataFrame
-        DataFrame con las categorías agrupadas y variables dummies creadas.
-    """
-
-    df = df.copy()
-
-    # Agrupación de categorías en otros 
-    df[columna] = np.where(df[columna].isin(categorias_principales), df[columna], 'OTROS')
-
-    # Se crean las columnas dummies de las categorías
-    categorias = [cat for cat in df[columna].unique() if cat != referencia]
-    for cat in categorias:
-        df[f"{columna}_{cat}"] = np.where(df[columna] == cat, 1, 0)
-
-    # Se elimina el campo original
-    df = df.drop(columns=columna)
-
-    return df
-
-def binarizar_variables(
-        df: pd.DataFrame, 
-        vars_corte_0:list, 
-        vars_corte_1:list) -> pd.DataFrame:
-    """
-    Binariza variables según su umbral:
-    - Para las variables en 'vars_corte_0', asigna 1 si valor > 0, sino 0.
-    - Para las variables en 'vars_corte_1', asigna 1 si valor > 1, sino 0.
-
-    Parámetros
-    ----------
-    df : pd.DataFrame. DataFrame con las variables numéricas.
-    
-    vars_corte_0 : list, Lista de variables cuyo umbral de comparación es 0.
-    
-    vars_corte_1 : list, Lista de variables cuyo umbral de comparación es 1.
-
-    Retorna
-    -------
-    pd.DataFrame con las variables transformadas a 0/1.
-    """
-
-    df = df.copy()
-
-    # Variables con valor mínimo en 0
-    for col in vars_corte_0:
-        if col in df.columns:
-            df[col] = np.where(df[col] > 0, 1, 0)
-
-    # Variables con valor mínimo en 1
-    for col in vars_corte_1:
-        if col in df.columns:
-            df[col] = np.where(df[col] > 1, 1, 0)
-
-    return df
-
-def transformacion_raiz_cuadrada(
-        df: pd.DataFrame, 
-        variables:list) -> pd.DataFrame:
-    """
-    Aplica la transformación raíz cuadrada a las columnas especificadas.
-    Los valores negativos se reemplazan por NaN antes de aplicar la raíz.
-
-    Parámetros
-    ----------
-    df : pd.DataFrame, DataFrame de entrada.
-    variables : list, Lista de nombres de columnas a transformar.
-
-    Retorna
-    -------
-    pd.DataFrame, con las columnas transformadas.
-    """
-    
-    df=df.copy()
-
-    for col in variables:
-        df[col] = np.where(df[col] >= 0, np.sqrt(df[col]), np.nan)
-
-    return df
-
-def cargar_modelo(ruta_modelo: str):
-    """
-    Carga un modelo previamente guardado en formato .joblib.
-
-    Parámetros
-    ----------
-    ruta_modelo : str, Ruta completa del archivo .joblib
-
-    Retorna
-    -------
-    modelo : object Modelo cargado listo para usar.
-    """
-    try:
-        modelo = joblib.load(ruta_modelo)
-        print(f"Modelo cargado correctamente desde: {ruta_modelo}")
-        return modelo
-    except FileNotFoundError:
-        print(f"No se encontró el archivo en la ruta: {ruta_modelo}")
-    except Exception as e:
-        print(f"Error al cargar el modelo: {e}")
-
-def ejecutar_modelo(
-        modelo, 
-        df: pd.DataFrame,
-        umbral: float = 0.565) -> pd.DataFrame:
-    """
-    Aplica un modelo de clasificación binaria sobre una base de datos
-    y agrega las columnas con la probabilidad y la predicción ajustada
-    según un umbral de clasificación.
-
-    Parámetros
-    ----------
-    modelo : object, Modelo previamente entrenado (debe tener el método predict_proba).
-    data : pd.DataFrame, Conjunto de datos sobre el cual se generarán las predicciones.
-    umbral : float, opcional (default=0.565), Umbral de clasificación para determinar la clase positiva (Fraude=1).
-
-    Retorna
-    -------
-    pd.DataFrame
-        DataFrame original con dos nuevas columnas:
-        - 'PROB_FRAUDE': Probabilidad de fraude
-        - 'PRED_FRAUDE': Predicción binaria (0 o 1)
-    """
-    try:
-        # Predicción de probabilidades
-        df = df.copy()
-        df["PROB_FRAUDE"] = modelo.predict_proba(df)[:, 1]
-
-        # Predicción según el umbral
-        df["PRED_FRAUDE"] = np.where(df["PROB_FRAUDE"] >= umbral, 1, 0)
-
-        print(f"Predicciones generadas correctamente (umbral = {umbral})")
-        return df
-
-    except Exception as e:
-        print(f"Error al ejecutar el modelo: {e}")
-        return df
\ No newline at end of file
+import functools
+import os
+
+import pandas as pd
+import numpy as np
+import joblib
+from scipy.special import expit
+from scipy.sparse import csr_matrix
+
+try:
+    import polars as pl
+except ImportError:  # polars es opcional: solo se usa con backend="polars"
+    pl = None
+
+# Copy-on-Write (pandas >= 2.0): las funciones de transformación trabajan
+# sobre referencias superficiales y pandas copia solo los bloques que se
+# escriben, en lugar de duplicar el DataFrame completo en cada llamada
+pd.set_option("mode.copy_on_write", True)
+
+variables=[
+    'A', 'B', 'C', 'D', 'E', 'H', 'J', 'M',
+    'N', 'O', 'P', 'Q', 'R', 'S','Monto'
+    ]
+
+# Index precalculado: evita la conversión lista->Index en cada llamada
+_VARS_IDX = pd.Index(variables)
+
+def seleccion_variables(
+        df:pd.DataFrame,
+        lista_vars: list = variables) -> pd.DataFrame:
+    """
+    Selecciona las columnas indicadas de un DataFrame. En particular las utilizadas 
+    para el funcionamiento del modelo de fraude.
+    
+    Args:
+        df (pd.DataFrame): DataFrame de entrada.
+        lista_vars (list): Lista de nombres de columnas a conservar.
+
+    Returns:
+        pd.DataFrame: DataFrame con solo las columnas seleccionadas.
+
+    Raises:
+        KeyError: Si alguna columna no se encuentra en el DataFrame.
+    """
+
+    idx = _VARS_IDX if lista_vars is variables else pd.Index(lista_vars)
+    faltantes = idx.difference(df.columns)
+    if len(faltantes):
+        raise KeyError(f"Al menos un campo no pertenece al conjunto de variables: {faltantes.tolist()}")
+    # reindex con copy=False no copia bloques si el orden de columnas ya coincide
+    return df.reindex(columns=idx, copy=False)
+
+    
+
+def _requiere_polars():
+    """Valida que polars esté instalado cuando se pide backend='polars'."""
+    if pl is None:
+        raise ImportError(
+            "El backend 'polars' requiere tener instalado el paquete polars"
+        )
+
+def limpiar_y_convertir(
+        df:pd.DataFrame,
+        columnas:list,
+        backend: str = 'pandas') -> pd.DataFrame :
+    """
+    Limpia separadores de miles y convierte columnas numéricas a float.
+    Ejemplo de valores corregidos: '1,234.8' → 1234.8
+
+    Parámetros:
+    -----------
+    df : pd.DataFrame, DataFrame con las columnas a limpiar
+    columnas : list, Lista de nombres de columnas a transformar
+    backend : str, opcional ('pandas' o 'polars'), motor de ejecución
+
+    Retorna:
+    --------
+    pd.DataFrame con las columnas convertidas a float
+    """
+    if backend == 'polars':
+        _requiere_polars()
+        pendientes = [c for c in columnas if not pd.api.types.is_numeric_dtype(df[c])]
+        lf = pl.from_pandas(df).lazy().with_columns([
+            pl.col(c).cast(pl.Utf8)
+              .str.replace_all(r'[,\s]+', '')
+              .cast(pl.Float32, strict=False)
+            for c in pendientes
+        ])
+        out = lf.collect().to_pandas()
+        out.index = df.index  # polars descarta el índice del llamador
+        return out
+
+    for col in columnas:
+        if pd.api.types.is_numeric_dtype(df[col]):  # ya es numérica, nada que limpiar
+            continue
+        # Con el dtype respaldado por pyarrow el replace corre como kernel de
+        # Arrow en C sobre buffers UTF-8 contiguos, sin un str de Python por celda
+        s = df[col].astype('string[pyarrow]')
+        # Un solo regex elimina comas (miles) y espacios en una única pasada;
+        # downcast='float' deja la columna en float32 y halva la memoria.
+        # La conversión final a float32 de numpy (NA -> NaN) evita devolver
+        # el dtype enmascarado Float32 y mantiene la paridad con polars
+        limpia = pd.to_numeric(s.str.replace(r'[,\s]+', '', regex=True),
+                               errors='coerce', downcast='float')
+        df[col] = limpia.to_numpy(np.float32, na_value=np.nan)
+    return df
+
+def ajustar_medianas(
+        df: pd.DataFrame,
+        columnas: list) -> dict:
+    """
+    Calcula la mediana de cada columna sobre los datos de entrenamiento
+    para reutilizarla al corregir lotes nuevos en scoring: las medianas son
+    una propiedad de la distribución de entrenamiento, no de cada lote.
+    El diccionario resultante puede persistirse junto al modelo (joblib).
+
+    Parámetros
+    ----------
+    df : pd.DataFrame, DataFrame de entrenamiento.
+    columnas : list, Lista con los nombres de las columnas a procesar.
+
+    Retorna
+    -------
+    dict con la mediana de cada columna ({columna: mediana}).
+    """
+    block = df[columnas].to_numpy(dtype=np.float32, copy=False)
+    return dict(zip(columnas, np.nanmedian(block, axis=0).astype(float)))
+
+def _medianas_del_bloque(block, columnas, medianas):
+    """Devuelve las medianas ajustadas si se proveen; si no, las del bloque."""
+    if medianas is not None:
+        return np.array([medianas[c] for c in columnas], dtype=np.float32)
+    return np.nanmedian(block, axis=0)
+
+def reemplazar_negativos_por_mediana(
+        df: pd.DataFrame,
+        columnas: list,
+        backend: str = 'pandas',
+        medianas: dict = None) -> pd.DataFrame:
+    """
+    Reemplaza los valores negativos en las columnas indicadas por la mediana
+    de su respectiva distribución (calculada sobre toda la columna).
+
+    Parámetros
+    ----------
+    df : pd.DataFrame, DataFrame con las columnas a corregir.
+    columnas : list, Lista con los nombres de las columnas a procesar.
+    backend : str, opcional ('pandas' o 'polars'), motor de ejecución.
+    medianas : dict, opcional, medianas ya ajustadas con ajustar_medianas; si se proveen se omite el recálculo sobre el lote.
+
+    Retorna
+    -------
+    pd.DataFrame con los valores negativos reemplazados por la mediana.
+    """
+    if backend == 'polars':
+        _requiere_polars()
+        lf = pl.from_pandas(df).lazy().with_columns([
+            pl.when(pl.col(c) < 0)
+              .then(pl.lit(medianas[c]) if medianas is not None else pl.col(c).median())
+              .otherwise(pl.col(c))
+              .alias(c)
+            for c in columnas
+        ])
+        out = lf.collect().to_pandas()
+        out.index = df.index  # polars descarta el índice del llamador
+        return out
+
+    # Todas las medianas en una sola reducción sobre el bloque 2D
+    # (copy=True: bajo CoW el buffer devuelto puede ser una vista de solo lectura)
+    block = df[columnas].to_numpy(dtype=np.float32, copy=True)
+    meds = _medianas_del_bloque(block, columnas, medianas)
+    np.putmask(block, block < 0, np.broadcast_to(meds, block.shape))  # Reemplazo
+    df[columnas] = block
+    return df
+
+def imputar_nulos_por_mediana(
+        df: pd.DataFrame,
+        columnas: list,
+        backend: str = 'pandas',
+        medianas: dict = None
+        ) -> pd.DataFrame:
+    """
+    Imputa los valores nulos en las columnas indicadas usando la mediana
+    de cada variable.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame, DataFrame con las columnas a corregir.
+    columnas : list, Lista con los nombres de las columnas a procesar.
+    backend : str, opcional ('pandas' o 'polars'), motor de ejecución.
+    medianas : dict, opcional, medianas ya ajustadas con ajustar_medianas; si se proveen se omite el recálculo sobre el lote.
+
+    Retorna
+    -------
+    pd.DataFrame con los valores nulos imputados por la mediana.
+    """
+    if backend == 'polars':
+        _requiere_polars()
+        lf = pl.from_pandas(df).lazy().with_columns([
+            pl.col(c).fill_null(
+                pl.lit(medianas[c]) if medianas is not None else pl.col(c).median()
+            )
+            for c in columnas
+        ])
+        out = lf.collect().to_pandas()
+        out.index = df.index  # polars descarta el índice del llamador
+        return out
+
+    # Todas las medianas en una sola reducción sobre el bloque 2D
+    # (copy=True: bajo CoW el buffer devuelto puede ser una vista de solo lectura)
+    block = df[columnas].to_numpy(dtype=np.float32, copy=True)
+    meds = _medianas_del_bloque(block, columnas, medianas)
+    np.putmask(block, np.isnan(block), np.broadcast_to(meds, block.shape))  # Imputación
+    df[columnas] = block
+    return df
+
+def sanear_columnas(
+        df: pd.DataFrame,
+        columnas: list,
+        medianas: dict = None) -> pd.DataFrame:
+    """
+    Reemplaza negativos e imputa nulos por la mediana en una sola pasada.
+    Equivale a encadenar reemplazar_negativos_por_mediana e
+    imputar_nulos_por_mediana pero recorre las columnas una única vez,
+    usando para ambos casos la mediana de la distribución original.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame, DataFrame con las columnas a corregir.
+    columnas : list, Lista con los nombres de las columnas a procesar.
+    medianas : dict, opcional, medianas ya ajustadas con ajustar_medianas; si se proveen se omite el recálculo sobre el lote.
+
+    Retorna
+    -------
+    pd.DataFrame con negativos y nulos reemplazados por la mediana.
+    """
+    block = df[columnas].to_numpy(dtype=np.float32, copy=True)
+    meds = _medianas_del_bloque(block, columnas, medianas)
+
+    # Una sola máscara fusionada (nulo o negativo) construida sin temporales
+    mask = np.isnan(block)
+    with np.errstate(invalid='ignore'):
+        np.logical_or(mask, block < 0, out=mask)
+    np.putmask(block, mask, np.broadcast_to(meds, block.shape))
+
+    df[columnas] = block
+    return df
+
+def dummificar_var_categorica(
+        df:pd.DataFrame, 
+        columna:str, 
+        categorias_principales:list,
+        referencia:str='OTROS',
+        umbral_sparse:int=32) -> pd.DataFrame:
+    """
+    Agrupa las categorías no deseadas en 'OTROS', crea variables dummies
+    y elimina la categoría de referencia. Las dummies siguen el orden de
+    'categorias_principales' (más 'OTROS'), por lo que el esquema de salida
+    es determinista aunque alguna categoría no aparezca en los datos.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame, DataFrame de entrada.
+
+    columna : str,  Nombre de la columna categórica a transformar.
+
+    categorias_principales : list, Lista de categorías que se desean conservar tal cual.
+
+    referencia : str, opcional (por defecto = 'OTROS') Categoría que se tomará como referencia (no se crea dummy para ella).
+
+    umbral_sparse : int, opcional (por defecto = 32) Cardinalidad a partir de la cual las dummies se devuelven en formato sparse (CSR), con memoria O(n) en lugar de O(n*k).
+
+    Retorna
+    -------
+    pd.DataFrame
+        DataFrame con las categorías agrupadas y variables dummies creadas.
+    """
+
+    df = df.copy(deep=False)
+
+    # Agrupación de categorías en otros: recodificación categórica directa a
+    # enteros (hash-join en C), sin materializar la columna objeto intermedia
+    # que generaba np.where + isin
+    completas = pd.Index(dict.fromkeys(list(categorias_principales) + ['OTROS']))
+    pos_otros = completas.get_loc('OTROS')
+    codes = np.asarray(pd.Categorical(df[columna], categories=completas).codes, dtype=np.intp)
+    codes[codes == -1] = pos_otros  # todo lo no principal cae al bucket OTROS
+
+    # Se excluye la categoría de referencia reubicando los códigos restantes
+    keep = completas != referencia
+    remap = np.where(keep, np.cumsum(keep) - 1, -1)
+    codes = remap[codes]
+
+    # Se crean las columnas dummies de las categorías en una sola pasada:
+    # la matriz 0/1 completa se construye indexando la identidad
+    # (int8 para reducir memoria)
+    categorias = completas[keep]
+    nombres = [f"{columna}_{cat}" for cat in categorias]
+    if len(categorias) == 0:
+        dummies = pd.DataFrame(np.empty((len(df), 0), dtype=np.int8), index=df.index)
+    else:
+        if len(categorias) > umbral_sparse:
+            # Alta cardinalidad: CSR guarda una sola entrada por fila en vez
+            # de densificar n*k ceros; sklearn acepta la matriz sparse directo
+            filas = np.flatnonzero(codes >= 0)
+            mat = csr_matrix(
+                (np.ones(len(filas), dtype=np.int8), (filas, codes[filas])),
+                shape=(len(df), len(categorias)),
+            )
+            dummies = pd.DataFrame.sparse.from_spmatrix(mat, index=df.index, columns=nombres)
+        else:
+            mat = np.eye(len(categorias), dtype=np.int8).take(np.where(codes >= 0, codes, 0), axis=0)
+            mat[codes < 0] = 0
+            dummies = pd.DataFrame(mat, columns=nombres, index=df.index, copy=False)
+
+    # Se elimina el campo original y se agregan todas las dummies de una vez
+    df = pd.concat([df.drop(columns=columna), dummies], axis=1)
+
+    return df
+
+def binarizar_variables(
+        df: pd.DataFrame,
+        vars_corte_0:list,
+        vars_corte_1:list,
+        backend: str = 'pandas') -> pd.DataFrame:
+    """
+    Binariza variables según su umbral:
+    - Para las variables en 'vars_corte_0', asigna 1 si valor > 0, sino 0.
+    - Para las variables en 'vars_corte_1', asigna 1 si valor > 1, sino 0.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame. DataFrame con las variables numéricas.
+
+    vars_corte_0 : list, Lista de variables cuyo umbral de comparación es 0.
+
+    vars_corte_1 : list, Lista de variables cuyo umbral de comparación es 1.
+
+    backend : str, opcional ('pandas' o 'polars'), motor de ejecución.
+
+    Retorna
+    -------
+    pd.DataFrame con las variables transformadas a 0/1.
+    """
+    if backend == 'polars':
+        _requiere_polars()
+        lf = pl.from_pandas(df).lazy().with_columns(
+            [(pl.col(c) > 0).fill_null(False).cast(pl.Int8)
+             for c in vars_corte_0 if c in df.columns]
+            + [(pl.col(c) > 1).fill_null(False).cast(pl.Int8)
+               for c in vars_corte_1 if c in df.columns]
+        )
+        out = lf.collect().to_pandas()
+        out.index = df.index  # polars descarta el índice del llamador
+        return out
+
+    df = df.copy(deep=False)
+
+    # Variables con valor mínimo en 0: una sola comparación 2D, salida int8
+    cols_0 = [col for col in vars_corte_0 if col in df.columns]
+    if cols_0:
+        df[cols_0] = (df[cols_0].to_numpy() > 0).view(np.int8)
+
+    # Variables con valor mínimo en 1: una sola comparación 2D, salida int8
+    cols_1 = [col for col in vars_corte_1 if col in df.columns]
+    if cols_1:
+        df[cols_1] = (df[cols_1].to_numpy() > 1).view(np.int8)
+
+    return df
+
+def transformacion_raiz_cuadrada(
+        df: pd.DataFrame, 
+        variables:list) -> pd.DataFrame:
+    """
+    Aplica la transformación raíz cuadrada a las columnas especificadas.
+    Los valores negativos se reemplazan por NaN antes de aplicar la raíz.
+
+    Parámetros
+    ----------
+    df : pd.DataFrame, DataFrame de entrada.
+    variables : list, Lista de nombres de columnas a transformar.
+
+    Retorna
+    -------
+    pd.DataFrame, con las columnas transformadas.
+    """
+    
+    df = df.copy(deep=False)
+
+    # Una sola pasada fusionada sobre el bloque completo: sqrt solo donde el
+    # valor es no negativo y NaN en el resto, sin temporales por columna
+    block = df[variables].to_numpy(dtype=np.float32)
+    out = np.full(block.shape, np.nan, dtype=np.float32)
+    np.sqrt(block, where=block >= 0, out=out)
+    df[variables] = out
+
+    return df
+
+@functools.lru_cache(maxsize=4)
+def _cargar_modelo_cacheado(ruta_modelo: str, mtime: float):
+    # mmap_mode='r' mapea los arrays NumPy del modelo directamente desde
+    # el archivo (requiere un dump sin comprimir): la carga pagina de
+    # forma perezosa y la memoria se comparte entre procesos
+    return joblib.load(ruta_modelo, mmap_mode='r')
+
+def cargar_modelo(ruta_modelo: str):
+    """
+    Carga un modelo previamente guardado en formato .joblib.
+    Las cargas repetidas de la misma ruta dentro del proceso se resuelven
+    desde caché (invalidada si cambia la fecha de modificación del archivo).
+
+    Parámetros
+    ----------
+    ruta_modelo : str, Ruta completa del archivo .joblib
+
+    Retorna
+    -------
+    modelo : object Modelo cargado listo para usar.
+    """
+    try:
+        modelo = _cargar_modelo_cacheado(ruta_modelo, os.path.getmtime(ruta_modelo))
+        print(f"Modelo cargado correctamente desde: {ruta_modelo}")
+        return modelo
+    except FileNotFoundError:
+        print(f"No se encontró el archivo en la ruta: {ruta_modelo}")
+    except Exception as e:
+        print(f"Error al cargar el modelo: {e}")
+
+def _scorear_en_paralelo(funcion_score, X, n_jobs):
+    """
+    Divide X en trozos por filas y aplica la función de score de un modelo
+    en paralelo con joblib, concatenando los resultados en orden.
+    """
+    # Nunca más trozos que filas: un trozo vacío hace fallar a sklearn
+    n_trozos = max(1, min(joblib.effective_n_jobs(n_jobs), len(X)))
+    trozos = np.array_split(X, n_trozos)
+    resultados = joblib.Parallel(n_jobs=n_jobs, backend='loky')(
+        joblib.delayed(funcion_score)(trozo) for trozo in trozos
+    )
+    return np.concatenate(resultados)
+
+def ejecutar_modelo(
+        modelo,
+        df: pd.DataFrame,
+        umbral: float = 0.565,
+        n_jobs: int = 1) -> pd.DataFrame:
+    """
+    Aplica un modelo de clasificación binaria sobre una base de datos
+    y agrega las columnas con la probabilidad y la predicción ajustada
+    según un umbral de clasificación.
+
+    Parámetros
+    ----------
+    modelo : object, Modelo previamente entrenado (debe tener el método predict_proba).
+    data : pd.DataFrame, Conjunto de datos sobre el cual se generarán las predicciones.
+    umbral : float, opcional (default=0.565), Umbral de clasificación para determinar la clase positiva (Fraude=1).
+    n_jobs : int, opcional (default=1), Número de procesos para scorear por trozos de filas con joblib (-1 usa todos los cores). Útil en bases grandes con modelos que predicen en un solo hilo.
+
+    Retorna
+    -------
+    pd.DataFrame
+        DataFrame original con dos nuevas columnas:
+        - 'PROB_FRAUDE': Probabilidad de fraude
+        - 'PRED_FRAUDE': Predicción binaria (0 o 1)
+    """
+    try:
+        df = df.copy(deep=False)
+        # float32 halva los bytes que entran a la multiplicación de sklearn
+        X = df.to_numpy(dtype=np.float32, copy=False)
+
+        if hasattr(modelo, "decision_function"):
+            # El margen escalar evita calcular y normalizar las dos columnas
+            # de predict_proba; el umbral se compara en escala log-odds
+            if n_jobs != 1:
+                score = _scorear_en_paralelo(modelo.decision_function, X, n_jobs)
+            else:
+                score = modelo.decision_function(X)
+            df["PROB_FRAUDE"] = expit(score).astype(np.float32, copy=False)
+            df["PRED_FRAUDE"] = (score >= np.log(umbral / (1 - umbral))).view(np.int8)
+        else:
+            if n_jobs != 1:
+                proba = _scorear_en_paralelo(modelo.predict_proba, X, n_jobs)
+            else:
+                proba = modelo.predict_proba(X)
+            # Probabilidad y predicción en dtypes compactos (float32/int8):
+            # una pasada vectorizada y un tercio de los bytes escritos
+            prob = proba[:, 1].astype(np.float32, copy=False)
+            df["PROB_FRAUDE"] = prob
+            df["PRED_FRAUDE"] = (prob >= umbral).view(np.int8)
+
+        print(f"Predicciones generadas correctamente (umbral = {umbral})")
+        return df
+
+    except Exception as e:
+        print(f"Error al ejecutar el modelo: {e}")
+        return df
+
+def ejecutar_modelo_por_lotes(
+        modelo,
+        lotes: list,
+        umbral: float = 0.565) -> list:
+    """
+    Agrupa varios lotes pequeños (por ejemplo, peticiones concurrentes de
+    un servicio) en una sola llamada al modelo y reparte los resultados.
+    Una única pasada sobre la matriz apilada amortiza el overhead de
+    despacho de sklearn que pagaría cada lote por separado.
+
+    Parámetros
+    ----------
+    modelo : object, Modelo previamente entrenado (debe tener el método predict_proba).
+    lotes : list, Lista de DataFrames con el mismo esquema de columnas.
+    umbral : float, opcional (default=0.565), Umbral de clasificación para determinar la clase positiva (Fraude=1).
+
+    Retorna
+    -------
+    list
+        Lista de DataFrames, uno por lote de entrada, con las columnas
+        'PROB_FRAUDE' y 'PRED_FRAUDE' agregadas.
+    """
+    if not lotes:
+        return []
+
+    # Se apilan los lotes, se predice una sola vez y se reparte por tamaño
+    df_total = pd.concat(lotes, axis=0)
+    resultado = ejecutar_modelo(modelo, df_total, umbral)
+
+    salidas = []
+    inicio = 0
+    for lote in lotes:
+        salidas.append(resultado.iloc[inicio:inicio + len(lote)])
+        inicio += len(lote)
+    return salidas
\ No newline at end of file